@@ -4,133 +4,133 @@ Create example archive files for testing Unfolder
 Run with: python create_examples.py
 """
 
-import os
+import io
+import copy
 import zipfile
 import tarfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Members with these extensions are already compressed - store them as-is
+COMPRESSED_EXTENSIONS = ('.zip', '.rar', '.7z', '.gz', '.bz2', '.tgz')
+
+def member_compress_type(name):
+    """Pick ZIP_STORED for already-compressed members, ZIP_DEFLATED otherwise"""
+    if name.lower().endswith(COMPRESSED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+# Shared member template - a fixed timestamp keeps the generated archives reproducible
+MEMBER_TEMPLATE = zipfile.ZipInfo(date_time=(1980, 1, 1, 0, 0, 0))
+MEMBER_TEMPLATE.external_attr = 0o600 << 16
+
+def add_member(zf, name, content):
+    """Add a member to an open ZIP, copying the shared ZipInfo template"""
+    info = copy.copy(MEMBER_TEMPLATE)
+    info.filename = name
+    info.compress_type = member_compress_type(name)
+    zf.writestr(info, content, compresslevel=1)
+
+def build_zip_bytes(files):
+    """Build a ZIP archive in memory and return its raw bytes"""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for name, content in files.items():
+            add_member(zf, name, content)
+    return buf.getvalue()
 
 def create_simple_nested():
     """Create simple nested archive structure"""
     print("📁 Creating simple_nested.zip...")
     
-    # Create content files
-    with zipfile.ZipFile('examples/simple_nested.zip', 'w') as outer_zip:
+    with zipfile.ZipFile('examples/simple_nested.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as outer_zip:
         # Create documents.zip
-        with zipfile.ZipFile('temp_documents.zip', 'w') as docs_zip:
-            docs_zip.writestr('report.pdf', 'Fake PDF content')
-            docs_zip.writestr('notes.txt', 'Meeting notes from 2023')
-        
-        outer_zip.write('temp_documents.zip', 'documents.zip')
+        documents = build_zip_bytes({
+            'report.pdf': 'Fake PDF content',
+            'notes.txt': 'Meeting notes from 2023',
+        })
+        add_member(outer_zip, 'documents.zip', documents)
         
         # Create photos.zip
-        with zipfile.ZipFile('temp_photos.zip', 'w') as photos_zip:
-            photos_zip.writestr('vacation.jpg', 'Fake JPG content')
-            photos_zip.writestr('family.png', 'Fake PNG content')
-        
-        outer_zip.write('temp_photos.zip', 'photos.zip')
-    
-    # Clean up temp files
-    os.remove('temp_documents.zip')
-    os.remove('temp_photos.zip')
+        photos = build_zip_bytes({
+            'vacation.jpg': 'Fake JPG content',
+            'family.png': 'Fake PNG content',
+        })
+        add_member(outer_zip, 'photos.zip', photos)
 
 def create_google_takeout_demo():
     """Create Google Takeout demo structure"""
     print("📁 Creating google_takeout_demo.zip...")
     
-    with zipfile.ZipFile('examples/google_takeout_demo.zip', 'w') as takeout_zip:
+    with zipfile.ZipFile('examples/google_takeout_demo.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as takeout_zip:
         # Drive folder
-        with zipfile.ZipFile('temp_drive_docs.zip', 'w') as drive_docs:
-            drive_docs.writestr('report_2023.docx', 'Document content')
-            drive_docs.writestr('budget_2023.xlsx', 'Spreadsheet content')
-        
-        with zipfile.ZipFile('temp_drive_sheets.zip', 'w') as drive_sheets:
-            drive_sheets.writestr('data_analysis.csv', 'CSV data')
-            drive_sheets.writestr('charts.xlsx', 'Chart data')
+        drive_docs = build_zip_bytes({
+            'report_2023.docx': 'Document content',
+            'budget_2023.xlsx': 'Spreadsheet content',
+        })
+        drive_sheets = build_zip_bytes({
+            'data_analysis.csv': 'CSV data',
+            'charts.xlsx': 'Chart data',
+        })
         
-        takeout_zip.write('temp_drive_docs.zip', 'Drive/documents.zip')
-        takeout_zip.write('temp_drive_sheets.zip', 'Drive/spreadsheets.zip')
+        add_member(takeout_zip, 'Drive/documents.zip', drive_docs)
+        add_member(takeout_zip, 'Drive/spreadsheets.zip', drive_sheets)
         
         # Photos folder
-        with zipfile.ZipFile('temp_photos_2021.zip', 'w') as photos_2021:
-            photos_2021.writestr('january/beach.jpg', 'Beach photo')
-            photos_2021.writestr('february/skiing.jpg', 'Skiing photo')
+        photos_2021 = build_zip_bytes({
+            'january/beach.jpg': 'Beach photo',
+            'february/skiing.jpg': 'Skiing photo',
+        })
+        photos_2022 = build_zip_bytes({
+            'summer/camping.jpg': 'Camping photo',
+            'winter/holidays.jpg': 'Holiday photo',
+        })
         
-        with zipfile.ZipFile('temp_photos_2022.zip', 'w') as photos_2022:
-            photos_2022.writestr('summer/camping.jpg', 'Camping photo')
-            photos_2022.writestr('winter/holidays.jpg', 'Holiday photo')
-        
-        takeout_zip.write('temp_photos_2021.zip', 'Photos/2021.zip')
-        takeout_zip.write('temp_photos_2022.zip', 'Photos/2022.zip')
+        add_member(takeout_zip, 'Photos/2021.zip', photos_2021)
+        add_member(takeout_zip, 'Photos/2022.zip', photos_2022)
         
         # Location History
-        with zipfile.ZipFile('temp_location.zip', 'w') as location:
-            location.writestr('Location History.json', '{"locations": [{"lat": 40.7128, "lon": -74.0060}]}')
-        
-        takeout_zip.write('temp_location.zip', 'Location History/Location History.zip')
-    
-    # Clean up temp files
-    os.remove('temp_drive_docs.zip')
-    os.remove('temp_drive_sheets.zip')
-    os.remove('temp_photos_2021.zip')
-    os.remove('temp_photos_2022.zip')
-    os.remove('temp_location.zip')
+        location = build_zip_bytes({
+            'Location History.json': '{"locations": [{"lat": 40.7128, "lon": -74.0060}]}',
+        })
+        add_member(takeout_zip, 'Location History/Location History.zip', location)
 
 def create_deeply_nested():
     """Create deeply nested archive"""
     print("📁 Creating deeply_nested.zip...")
     
-    # Start with innermost content
-    Path('temp_level5').mkdir(exist_ok=True)
-    with open('temp_level5/final_content.txt', 'w') as f:
-        f.write('This is the final content at level 5!')
-    
     # Level 5: Create innermost ZIP
-    with zipfile.ZipFile('temp_level5.zip', 'w') as zip5:
-        zip5.write('temp_level5/final_content.txt', 'final_content.txt')
-    
-    # Level 4: ZIP containing level 5
-    with zipfile.ZipFile('temp_level4.zip', 'w') as zip4:
-        zip4.write('temp_level5.zip', 'level5.zip')
+    payload = build_zip_bytes({'final_content.txt': 'This is the final content at level 5!'})
     
-    # Level 3: ZIP containing level 4
-    with zipfile.ZipFile('temp_level3.zip', 'w') as zip3:
-        zip3.write('temp_level4.zip', 'level4.zip')
-    
-    # Level 2: ZIP containing level 3
-    with zipfile.ZipFile('temp_level2.zip', 'w') as zip2:
-        zip2.write('temp_level3.zip', 'level3.zip')
+    # Levels 4-2: wrap the previous level in a new in-memory ZIP
+    for level in range(5, 2, -1):
+        payload = build_zip_bytes({f'level{level}.zip': payload})
     
     # Level 1: Final outer ZIP containing level 2
-    with zipfile.ZipFile('examples/deeply_nested.zip', 'w') as zip1:
-        zip1.write('temp_level2.zip', 'level1.zip')
-    
-    # Clean up
-    import shutil
-    shutil.rmtree('temp_level5')
-    os.remove('temp_level5.zip')
-    os.remove('temp_level4.zip')
-    os.remove('temp_level3.zip')
-    os.remove('temp_level2.zip')
+    with zipfile.ZipFile('examples/deeply_nested.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip1:
+        add_member(zip1, 'level1.zip', payload)
 
 def create_mixed_formats():
     """Create archive with mixed formats (ZIP only for demo)"""
     print("📁 Creating mixed_formats.zip...")
     
-    with zipfile.ZipFile('examples/mixed_formats.zip', 'w') as mixed_zip:
+    with zipfile.ZipFile('examples/mixed_formats.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as mixed_zip:
         # Simulate different formats with appropriate content
-        mixed_zip.writestr('data.tar.gz', 'Simulated TAR.GZ content')
-        mixed_zip.writestr('backup.7z', 'Simulated 7Z content')
-        mixed_zip.writestr('documents.rar', 'Simulated RAR content')
-        mixed_zip.writestr('logs.zip', 'Simulated nested ZIP content')
+        placeholders = {
+            'data.tar.gz': 'Simulated TAR.GZ content',
+            'backup.7z': 'Simulated 7Z content',
+            'documents.rar': 'Simulated RAR content',
+            'logs.zip': 'Simulated nested ZIP content',
+        }
+        for name, content in placeholders.items():
+            add_member(mixed_zip, name, content)
         
         # Add a real nested ZIP for demonstration
-        with zipfile.ZipFile('temp_logs.zip', 'w') as logs:
-            logs.writestr('app.log', 'Application log content')
-            logs.writestr('error.log', 'Error log content')
-        
-        mixed_zip.write('temp_logs.zip', 'logs.zip')
-    
-    os.remove('temp_logs.zip')
+        logs = build_zip_bytes({
+            'app.log': 'Application log content',
+            'error.log': 'Error log content',
+        })
+        add_member(mixed_zip, 'logs.zip', logs)
 
 def main():
     """Create all example archives"""
@@ -140,11 +140,17 @@ def main():
     # Ensure examples directory exists
     Path('examples').mkdir(exist_ok=True)
     
-    # Create all examples
-    create_simple_nested()
-    create_google_takeout_demo()
-    create_deeply_nested()
-    create_mixed_formats()
+    # Create all examples - they write to separate files, so build them in parallel
+    builders = [
+        create_simple_nested,
+        create_google_takeout_demo,
+        create_deeply_nested,
+        create_mixed_formats
+    ]
+    with ProcessPoolExecutor(max_workers=len(builders)) as executor:
+        futures = [executor.submit(builder) for builder in builders]
+        for future in futures:
+            future.result()  # Re-raise any error from the worker
     
     print("\n✅ All example archives created!")
     print("📁 Location: examples/ folder")
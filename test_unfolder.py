@@ -4,12 +4,19 @@ Basic tests for Unfolder - Simple Archive Extractor
 Run with: python test_unfolder.py
 """
 
+import io
 import os
+import copy
+import re
 import sys
+import bz2
+import gzip
+import functools
 import tempfile
 import shutil
 import zipfile
 import tarfile
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
 
 # Add current directory to path for imports
@@ -22,53 +29,119 @@ except ImportError as e:
     print("Make sure unfolder.py is in the same directory")
     sys.exit(1)
 
-def create_test_archives(test_dir):
-    """Create test archive files for testing"""
-    print("📁 Creating test archives...")
+# Strings test_preview_mode expects to see in the dry-run output
+PREVIEW_MARKERS = re.compile(r'test\.zip|test\.tar\.gz|nested\.zip|DRY RUN MODE')
+
+# Contents of the test archives, pre-encoded once at import
+TEST_FILES = {
+    'document.txt': b'This is a test document',
+    'data.json': b'{"test": true, "nested": {"value": 42}}',
+    'subdir/nested.txt': b'Nested file content'
+}
+
+# Stored, fixed-timestamp member template so the cached fixtures are byte-for-byte stable
+ZIP_MEMBER_TEMPLATE = zipfile.ZipInfo(date_time=(1980, 1, 1, 0, 0, 0))
+ZIP_MEMBER_TEMPLATE.compress_type = zipfile.ZIP_STORED
+
+def zip_member(name):
+    """Return a copy of the member template named `name`"""
+    info = copy.copy(ZIP_MEMBER_TEMPLATE)
+    info.filename = name
+    return info
+
+@functools.lru_cache(maxsize=None)
+def _fixtures():
+    """Build the test archives once and return their raw bytes by filename"""
+    # Create ZIP archive
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, 'w') as zf:
+        for file_path, data in TEST_FILES.items():
+            zf.writestr(zip_member(file_path), data)
+    
+    # Create TAR.GZ archive (stream mode - no seeking back over written members).
+    # Gzip is applied outside tarfile so the level can be lowered: 'w|gz' is fixed at 9.
+    tar_buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=tar_buf, mode='wb', compresslevel=1, mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode='w|', bufsize=1 << 20) as tf:
+        for file_path, data in TEST_FILES.items():
+            info = tarfile.TarInfo(file_path)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    
+    # Create nested ZIP (ZIP inside ZIP)
+    nested_buf = io.BytesIO()
+    with zipfile.ZipFile(nested_buf, 'w') as zf:
+        zf.writestr(zip_member('inner.zip'), zip_buf.getvalue())
     
-    # Create some test files
-    test_files = {
-        'document.txt': 'This is a test document',
-        'data.json': '{"test": true, "nested": {"value": 42}}',
-        'subdir/nested.txt': 'Nested file content'
+    return {
+        'test.zip': zip_buf.getvalue(),
+        'test.tar.gz': tar_buf.getvalue(),
+        'nested.zip': nested_buf.getvalue()
     }
+
+class Reporter:
+    """Collect a test's result lines and print them in a single write"""
     
-    # Create test directory structure
-    for file_path, content in test_files.items():
-        full_path = test_dir / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_text(content)
+    __slots__ = ('lines',)
     
-    # Create ZIP archive
-    zip_path = test_dir / 'test.zip'
-    with zipfile.ZipFile(zip_path, 'w') as zf:
-        for file_path in test_files:
-            zf.write(test_dir / file_path, file_path)
+    def __init__(self):
+        self.lines = []
     
-    # Create TAR.GZ archive
-    tar_path = test_dir / 'test.tar.gz'
-    with tarfile.open(tar_path, 'w:gz') as tf:
-        for file_path in test_files:
-            tf.add(test_dir / file_path, file_path)
+    def __enter__(self):
+        return self
     
-    # Create nested ZIP (ZIP inside ZIP)
-    nested_zip_path = test_dir / 'nested.zip'
-    with zipfile.ZipFile(nested_zip_path, 'w') as zf:
-        zf.write(zip_path, 'inner.zip')
+    def __exit__(self, *exc_info):
+        if self.lines:
+            print('\n'.join(self.lines))
+        return False
+    
+    def ok(self, msg, indent=2):
+        self.lines.append(f"{' ' * indent}✅ {msg}")
+    
+    def fail(self, msg, indent=2):
+        self.lines.append(f"{' ' * indent}❌ {msg}")
     
-    return [zip_path, tar_path, nested_zip_path]
+    def warn(self, msg, indent=2):
+        self.lines.append(f"{' ' * indent}⚠️ {msg}")
+    
+    def info(self, msg, indent=2):
+        self.lines.append(f"{' ' * indent}{msg}")
 
-def test_basic_extraction():
-    """Test basic archive extraction"""
-    print("\n🧪 Testing basic extraction...")
+def create_test_archives(test_dir):
+    """Create test archive files for testing"""
+    print("📁 Creating test archives...")
+    
+    archives = []
+    for name, data in _fixtures().items():
+        archive_path = test_dir / name
+        archive_path.write_bytes(data)
+        archives.append(archive_path)
     
+    return archives
+
+def write_raw(path, data):
+    """Write bytes with a single unbuffered os.write() call"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def temp_test_dir(with_archives=True):
+    """Yield a fresh test_input directory, optionally holding the cached test archives"""
     with tempfile.TemporaryDirectory() as temp_dir:
         test_dir = Path(temp_dir) / 'test_input'
         test_dir.mkdir()
-        
-        # Create test archives
-        archives = create_test_archives(test_dir)
-        
+        if with_archives:
+            create_test_archives(test_dir)
+        yield test_dir
+
+def test_basic_extraction():
+    """Test basic archive extraction"""
+    print("\n🧪 Testing basic extraction...")
+    
+    with temp_test_dir() as test_dir:
         # Test extraction
         extractor = SimpleExtractor(test_dir, delete_after=False)
         extractor.extract_all()
@@ -80,98 +153,81 @@ def test_basic_extraction():
             test_dir / 'nested'
         ]
         
-        for extract_dir in extracted_dirs:
-            if extract_dir.exists():
-                print(f"  ✅ Extracted: {extract_dir.name}")
-                # Check for expected files
-                if (extract_dir / 'document.txt').exists():
-                    print(f"    ✅ Found document.txt")
-                if (extract_dir / 'data.json').exists():
-                    print(f"    ✅ Found data.json")
-            else:
-                print(f"  ❌ Missing: {extract_dir.name}")
-        
-        # Check statistics
-        print(f"  📊 Stats: {extractor.stats}")
+        with Reporter() as report:
+            for extract_dir in extracted_dirs:
+                if extract_dir.exists():
+                    report.ok(f"Extracted: {extract_dir.name}")
+                    # Check for expected files (one directory listing instead of a stat per file)
+                    names = {entry.name for entry in os.scandir(extract_dir)}
+                    if 'document.txt' in names:
+                        report.ok("Found document.txt", indent=4)
+                    if 'data.json' in names:
+                        report.ok("Found data.json", indent=4)
+                else:
+                    report.fail(f"Missing: {extract_dir.name}")
+            
+            # Check statistics
+            report.info(f"📊 Stats: {extractor.stats}")
 
 def test_preview_mode():
     """Test dry-run/preview mode"""
     print("\n🧪 Testing preview mode...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_dir = Path(temp_dir) / 'test_input'
-        test_dir.mkdir()
-        
-        # Create test archives
-        archives = create_test_archives(test_dir)
-        
+    with temp_test_dir() as test_dir:
         # Test preview (capture output)
-        import io
-        from contextlib import redirect_stdout
-        
         f = io.StringIO()
         with redirect_stdout(f):
             preview_extraction(test_dir)
         
         output = f.getvalue()
         
-        # Check if preview contains expected information
-        if 'test.zip' in output:
-            print("  ✅ Preview shows test.zip")
-        if 'test.tar.gz' in output:
-            print("  ✅ Preview shows test.tar.gz")
-        if 'nested.zip' in output:
-            print("  ✅ Preview shows nested.zip")
-        if 'DRY RUN MODE' in output:
-            print("  ✅ Preview mode indicated")
+        # Check if preview contains expected information (single pass over the output)
+        found = set(PREVIEW_MARKERS.findall(output))
+        with Reporter() as report:
+            if 'test.zip' in found:
+                report.ok("Preview shows test.zip")
+            if 'test.tar.gz' in found:
+                report.ok("Preview shows test.tar.gz")
+            if 'nested.zip' in found:
+                report.ok("Preview shows nested.zip")
+            if 'DRY RUN MODE' in found:
+                report.ok("Preview mode indicated")
 
 def test_error_handling():
     """Test error handling with corrupted archives"""
     print("\n🧪 Testing error handling...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_dir = Path(temp_dir) / 'test_input'
-        test_dir.mkdir()
-        
+    with temp_test_dir(with_archives=False) as test_dir:
         # Create a corrupted ZIP file
         corrupted_zip = test_dir / 'corrupted.zip'
-        corrupted_zip.write_bytes(b'This is not a valid ZIP file')
+        write_raw(corrupted_zip, b'This is not a valid ZIP file')
         
         # Test extraction with corrupted file
         extractor = SimpleExtractor(test_dir, delete_after=False)
         extractor.extract_all()
         
         # Should handle gracefully
-        if extractor.stats['failed'] > 0:
-            print(f"  ✅ Handled corrupted file: {extractor.stats['failed']} failed")
-        else:
-            print("  ⚠️ Expected to handle corrupted file")
+        with Reporter() as report:
+            if extractor.stats['failed'] > 0:
+                report.ok(f"Handled corrupted file: {extractor.stats['failed']} failed")
+            else:
+                report.warn("Expected to handle corrupted file")
 
 def test_nested_extraction():
     """Test nested archive extraction"""
     print("\n🧪 Testing nested extraction...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_dir = Path(temp_dir) / 'test_input'
-        test_dir.mkdir()
-        
-        # Create nested structure: outer.zip -> inner.zip -> content
-        inner_content = test_dir / 'content.txt'
-        inner_content.write_text('Inner content')
-        
-        # Create inner ZIP
-        inner_zip = test_dir / 'inner.zip'
-        with zipfile.ZipFile(inner_zip, 'w') as zf:
-            zf.write(inner_content, 'content.txt')
-        
-        # Create outer ZIP containing inner ZIP
-        outer_zip = test_dir / 'outer.zip'
-        with zipfile.ZipFile(outer_zip, 'w') as zf:
-            zf.write(inner_zip, 'inner.zip')
+    with temp_test_dir(with_archives=False) as test_dir:
+        # Create nested structure in memory: outer.zip -> inner.zip -> content
+        name, payload = 'content.txt', b'Inner content'
+        for layer in ('inner.zip', 'outer.zip'):
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, 'w') as zf:
+                zf.writestr(name, payload)
+            name, payload = layer, buf.getvalue()
         
-        # Clean up intermediate files
-        inner_content.unlink()
-        inner_zip.unlink()
+        # Only the outer ZIP touches disk
+        (test_dir / 'outer.zip').write_bytes(payload)
         
         # Test nested extraction
         extractor = SimpleExtractor(test_dir, delete_after=False)
@@ -181,20 +237,145 @@ def test_nested_extraction():
         outer_dir = test_dir / 'outer'
         inner_dir = outer_dir / 'inner'
         
-        if outer_dir.exists() and inner_dir.exists():
-            if (inner_dir / 'content.txt').exists():
-                print("  ✅ Nested extraction successful")
+        with Reporter() as report:
+            if outer_dir.exists() and inner_dir.exists():
+                if (inner_dir / 'content.txt').exists():
+                    report.ok("Nested extraction successful")
+                else:
+                    report.fail("Nested content not found")
             else:
-                print("  ❌ Nested content not found")
-        else:
-            print("  ❌ Nested directories not created")
+                report.fail("Nested directories not created")
+
+def test_readonly_directory():
+    """Test a TAR whose directory is read-only still gets its files"""
+    print("\n🧪 Testing read-only TAR directory...")
+    
+    with temp_test_dir(with_archives=False) as test_dir:
+        # pkg/ is 0o555 and listed before its file, as tar writes it
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w') as tf:
+            directory = tarfile.TarInfo('pkg')
+            directory.type = tarfile.DIRTYPE
+            directory.mode = 0o555
+            tf.addfile(directory)
+            data = b'Read-only directory content'
+            info = tarfile.TarInfo('pkg/file.txt')
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+        write_raw(test_dir / 'readonly.tar', buf.getvalue())
+        
+        extractor = SimpleExtractor(test_dir, delete_after=False)
+        extractor.extract_all()
+        
+        pkg_dir = test_dir / 'readonly' / 'pkg'
+        with Reporter() as report:
+            if (pkg_dir / 'file.txt').exists():
+                report.ok("File extracted into read-only directory")
+            else:
+                report.fail("File missing from read-only directory")
+            if pkg_dir.exists() and pkg_dir.stat().st_mode & 0o777 == 0o555:
+                report.ok("Directory mode applied after its files")
+            else:
+                report.fail("Directory mode not applied")
+        
+        # Let the temporary directory be removed
+        if pkg_dir.exists():
+            pkg_dir.chmod(0o755)
+
+def test_tar_link_escape():
+    """Test a TAR symlink can't be used to write outside the extraction folder"""
+    print("\n🧪 Testing TAR link escape...")
+    
+    with temp_test_dir(with_archives=False) as test_dir:
+        outside_dir = test_dir.parent / 'outside'
+        outside_dir.mkdir()
+        
+        # evil -> outside/, then a regular file written through it
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w') as tf:
+            link = tarfile.TarInfo('evil')
+            link.type = tarfile.SYMTYPE
+            link.linkname = str(outside_dir)
+            tf.addfile(link)
+            data = b'Should stay inside'
+            info = tarfile.TarInfo('evil/escaped.txt')
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+        write_raw(test_dir / 'links.tar', buf.getvalue())
+        
+        extractor = SimpleExtractor(test_dir, delete_after=False)
+        extractor.extract_all()
+        
+        with Reporter() as report:
+            if (outside_dir / 'escaped.txt').exists():
+                report.fail("File written outside the extraction folder")
+            else:
+                report.ok("Link pointing outside was skipped")
+
+def test_tar_link_fallback():
+    """Test TAR links are copied when the OS refuses to create them (e.g. Windows without privilege)"""
+    print("\n🧪 Testing TAR link fallback...")
+    
+    with temp_test_dir(with_archives=False) as test_dir:
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tf:
+            data = b'Link target content'
+            info = tarfile.TarInfo('pkg/real.txt')
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+            for name, link_type, link_name in (('pkg/link.txt', tarfile.SYMTYPE, 'real.txt'),
+                                               ('pkg/hard.txt', tarfile.LNKTYPE, 'pkg/real.txt')):
+                link = tarfile.TarInfo(name)
+                link.type = link_type
+                link.linkname = link_name
+                tf.addfile(link)
+        write_raw(test_dir / 'links.tar.gz', buf.getvalue())
+        
+        def refuse(*args, **kwargs):
+            raise OSError("Links not permitted")
+        
+        saved = os.symlink, os.link
+        os.symlink = os.link = refuse
+        try:
+            extractor = SimpleExtractor(test_dir, delete_after=False)
+            extractor.extract_all()
+        finally:
+            os.symlink, os.link = saved
+        
+        pkg_dir = test_dir / 'links' / 'pkg'
+        with Reporter() as report:
+            for name in ('link.txt', 'hard.txt'):
+                link_path = pkg_dir / name
+                if link_path.exists() and link_path.read_bytes() == data:
+                    report.ok(f"Copied in place of link: {name}")
+                else:
+                    report.fail(f"Link member missing: {name}")
+
+def test_single_file_compression():
+    """Test standalone .gz/.bz2 files are decompressed, and tarballs among them still unpacked"""
+    print("\n🧪 Testing single-file compression...")
+    
+    with temp_test_dir(with_archives=False) as test_dir:
+        write_raw(test_dir / 'dump.sql.gz', gzip.compress(b'select 1;'))
+        write_raw(test_dir / 'notes.txt.bz2', bz2.compress(b'Compressed notes'))
+        write_raw(test_dir / 'backup.gz', _fixtures()['test.tar.gz'])  # A tarball without '.tar'
+        
+        extractor = SimpleExtractor(test_dir, delete_after=False)
+        extractor.extract_all()
+        
+        with Reporter() as report:
+            for output, expected in ((test_dir / 'dump.sql' / 'dump.sql', b'select 1;'),
+                                     (test_dir / 'notes.txt' / 'notes.txt', b'Compressed notes'),
+                                     (test_dir / 'backup' / 'document.txt', TEST_FILES['document.txt'])):
+                if output.exists() and output.read_bytes() == expected:
+                    report.ok(f"Decompressed: {output.name}")
+                else:
+                    report.fail(f"Missing or wrong content: {output.name}")
 
 def test_archive_detection():
     """Test archive file detection"""
     print("\n🧪 Testing archive detection...")
     
-    extractor = SimpleExtractor(Path('.'))  # Dummy path
-    
     # Test various file extensions
     test_cases = [
         ('test.zip', True),
@@ -210,10 +391,11 @@ def test_archive_detection():
         ('test', False)
     ]
     
-    for filename, expected in test_cases:
-        result = extractor._is_archive(Path(filename))
-        status = "✅" if result == expected else "❌"
-        print(f"  {status} {filename}: {result} (expected {expected})")
+    with Reporter() as report:
+        for filename, expected in test_cases:
+            result = SimpleExtractor._is_archive(filename)
+            check = report.ok if result == expected else report.fail
+            check(f"{filename}: {result} (expected {expected})")
 
 def main():
     """Run all tests"""
@@ -225,7 +407,11 @@ def main():
         test_basic_extraction,
         test_preview_mode,
         test_error_handling,
-        test_nested_extraction
+        test_nested_extraction,
+        test_readonly_directory,
+        test_tar_link_escape,
+        test_tar_link_fallback,
+        test_single_file_compression
     ]
     
     passed = 0
@@ -9,12 +9,17 @@ Version: 3.1
 
 import os
 import sys
+import bz2
+import gzip
+import mmap
 import zipfile
 import tarfile
 import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
 
 # Optional libraries for extended format support
 try:
@@ -94,12 +99,38 @@ def offer_powershell_fallback():
     return False
 
 
+class ExtractionCancelled(Exception):
+    """Raised inside a worker after Ctrl-C - deliberately not an OSError, so it isn't reported as one"""
+
+
+class _MappedArchive(mmap.mmap):
+    """Read-only memory map usable as a ZipFile source (mmap.seekable() only exists on 3.13+)"""
+    
+    def seekable(self):
+        return True
+
+
 class SimpleExtractor:
+    # Supported archive extensions, as a tuple for a single str.endswith() call
+    ARCHIVE_EXTENSIONS = ('.zip', '.tar.gz', '.tar.bz2', '.tgz', '.rar', '.7z', '.tar', '.gz', '.bz2')
+    
+    # Copy archive members in 2 MiB chunks rather than the 16-64 KiB library defaults
+    COPY_BUFFER_SIZE = 2 * 1024 * 1024
+    SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+    
+    # Characters Windows doesn't allow in file names, replaced with '_' as zipfile does
+    WINDOWS_NAME_TABLE = str.maketrans(':<>|"?*', '_' * 7)
+    
+    # Fixed attribute set - no per-instance __dict__, faster attribute access in the scan loop
+    __slots__ = ('source_folder', 'delete_after', 'maintain_hierarchy', 'processed_files',
+                 'pending_deletions', 'stats', 'start_time', '_lock', '_print_lock', '_output',
+                 '_cancelled')
+    
     def __init__(self, source_folder, delete_after=False, maintain_hierarchy=False):
         self.source_folder = Path(source_folder)
         self.delete_after = delete_after
         self.maintain_hierarchy = maintain_hierarchy
-        self.processed_files = set()
+        self.processed_files = set()  # (device, inode), or resolved path, of every archive handled
         self.pending_deletions = []  # Track archives to delete at end
         self.stats = {
             'extracted': 0, 
@@ -109,169 +140,444 @@ class SimpleExtractor:
             'cleaned_up': 0
         }
         self.start_time = None
+        self._lock = threading.Lock()  # Guards stats updated from worker threads
+        self._print_lock = threading.Lock()  # One archive's lines print together, never interleaved
+        self._output = threading.local()  # Per-thread output buffer while extracting
+        self._cancelled = threading.Event()  # Set on Ctrl-C - workers stop at the next member
         
-    def _is_archive(self, file_path):
-        """Check if file is a supported archive"""
-        file_path_str = str(file_path).lower()
-        archive_extensions = ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.tgz', '.tar.gz', '.tar.bz2']
-        return any(file_path_str.endswith(ext) for ext in archive_extensions)
+    @staticmethod
+    def _is_archive(file_path):
+        """Check if file (a Path or a plain filename) is a supported archive"""
+        name = file_path if isinstance(file_path, str) else file_path.name
+        return name.lower().endswith(SimpleExtractor.ARCHIVE_EXTENSIONS)
+    
+    def _iter_archives(self, root):
+        """Yield a DirEntry for every archive below root using os.scandir"""
+        pending_dirs = [os.fspath(root)]
+        is_archive = self._is_archive
+        while pending_dirs:
+            try:
+                with os.scandir(pending_dirs.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                        elif is_archive(entry.name) and entry.is_file():
+                            yield entry
+            except OSError:
+                pass  # Unreadable directory - skip it, as os.walk does
+    
+    def _outermost_dirs(self, dirs):
+        """Drop directories nested inside another one in the set, so nothing is scanned twice"""
+        outermost = set()
+        for directory in sorted(dirs, key=lambda d: len(d.parts)):
+            if not any(parent in outermost for parent in directory.parents):
+                outermost.add(directory)
+        return sorted(outermost)
+    
+    def _file_id(self, entry):
+        """Identify a file by (device, inode) - two small ints instead of its full path"""
+        # Both values come from the same lstat, so a symlink is keyed as itself, not its target.
+        # DirEntry.stat() reports st_dev and st_ino as 0 on Windows, so stat the path there.
+        if os.name == 'nt':
+            st = os.stat(entry.path, follow_symlinks=False)
+        else:
+            st = entry.stat(follow_symlinks=False)  # Cached on the DirEntry after the first call
+        if not st.st_ino:
+            # Some file systems and network shares report no inode - every file would look the same
+            return os.path.realpath(entry.path)
+        return (st.st_dev, st.st_ino)
     
     def _get_file_size(self, file_path):
-        """Get file size in bytes"""
+        """Get file size in bytes (accepts a Path or a DirEntry)"""
         try:
             return file_path.stat().st_size
         except:
             return 0
     
+    def _print(self, message=""):
+        """print(), buffered per thread while a worker is extracting archives"""
+        lines = getattr(self._output, 'lines', None)
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
+    
+    def _print_now(self, message=""):
+        """print() straight away, even from a worker - for progress that shouldn't wait"""
+        with self._print_lock:
+            print(message)
+    
     def _format_size(self, size_bytes):
         """Format bytes to human readable size"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"
+        # Each unit is 2**10 of the previous one, so the bit length picks the unit directly
+        index = min(len(self.SIZE_UNITS) - 1, max(0, (int(size_bytes).bit_length() - 1) // 10))
+        return f"{size_bytes / (1 << (index * 10)):.2f} {self.SIZE_UNITS[index]}"
+    
+    def _member_path(self, extract_to, member_name):
+        """Map an archive member name to a path under extract_to (None for absolute or '..' names)"""
+        # Only the name is checked here - links already on disk are handled by _is_inside()
+        parts = [part for part in member_name.replace('\\', '/').split('/') if part not in ('', '.')]
+        if not parts:
+            return extract_to  # The archive root itself, e.g. the './' entry tar -C dir writes
+        if '..' in parts or os.path.splitdrive(parts[0])[0]:
+            return None
+        if os.sep == '\\':
+            # Same cleanup zipfile's extractall() does on Windows: no :<>|"?* or trailing dots/spaces
+            parts = [part.translate(self.WINDOWS_NAME_TABLE).rstrip('. ') for part in parts]
+            parts = [part for part in parts if part]
+            if not parts:
+                return None
+        return extract_to.joinpath(*parts)
+    
+    def _is_inside(self, path, real_root):
+        """Check that path, with any symlinks resolved, stays under the resolved real_root"""
+        try:
+            return os.path.commonpath([os.path.realpath(path), real_root]) == real_root
+        except ValueError:
+            return False  # Different drives on Windows
+    
+    def _check_cancelled(self):
+        """Stop the current extraction if the user pressed Ctrl-C"""
+        if self._cancelled.is_set():
+            raise ExtractionCancelled()
+    
+    def _make_link(self, member, target_path, link_target):
+        """Create a TAR link member, copying its already-extracted target if links aren't allowed"""
+        if os.path.lexists(target_path):
+            os.unlink(target_path)  # Replace an earlier member of the same name, as tarfile does
+        try:
+            if member.issym():
+                os.symlink(member.linkname, target_path)
+            else:
+                os.link(link_target, target_path)
+            return
+        except (OSError, NotImplementedError):
+            pass  # e.g. no symlink privilege on Windows, or a file system without hard links
+        if os.path.isfile(link_target):
+            shutil.copy2(link_target, target_path)
+        else:
+            self._print(f"  ⚠️  Could not create link {member.name} -> {member.linkname}")
+    
+    def _write_member(self, source, target_path):
+        """Copy an open archive member to target_path through a large buffer"""
+        with open(target_path, 'wb') as target:
+            shutil.copyfileobj(source, target, self.COPY_BUFFER_SIZE)
     
-    def _extract_zip(self, archive_path, extract_to):
+    def _open_sequential(self, archive_path, buffering=-1):
+        """Open an archive for reading and hint the OS that it will be read front to back"""
+        # O_SEQUENTIAL maps to FILE_FLAG_SEQUENTIAL_SCAN on Windows; elsewhere use posix_fadvise
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_SEQUENTIAL', 0)
+        fd = os.open(archive_path, flags)
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass  # Advice only - some filesystems don't support it
+        return os.fdopen(fd, 'rb', buffering=buffering)
+    
+    def _open_random_access(self, archive_path):
+        """Memory-map an archive for random access, falling back to a buffered file"""
+        # No sequential hint here - ZIP reads the central directory at the end, then seeks per member
+        with open(archive_path, 'rb') as archive_file:
+            try:
+                return _MappedArchive(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass  # Empty file or mapping not supported here
+        return open(archive_path, 'rb', buffering=self.COPY_BUFFER_SIZE)
+    
+    def _record_top_level(self, extract_to, target_path, top_level):
+        """Remember the top-level item a member lands in, and whether it existed before"""
+        top = extract_to / target_path.relative_to(extract_to).parts[0]
+        if top not in top_level:
+            top_level[top] = not os.path.lexists(top)
+    
+    def _extract_zip(self, archive_path, extract_to, top_level):
         """Extract ZIP files"""
         try:
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                # Check for password protection
-                if zip_ref.testzip() is None and any(needs_pwd for needs_pwd in [f.flag_bits & 0x1 for f in zip_ref.infolist()]):
-                    print(f"  ⚠️  ZIP may be password protected - will attempt extraction")
+            with self._open_random_access(archive_path) as archive_file, \
+                    zipfile.ZipFile(archive_file, 'r') as zip_ref:
+                infos = zip_ref.infolist()
+                
+                # Check for password protection (encryption flag bit, no need to decompress)
+                if any(info.flag_bits & 0x1 for info in infos):
+                    self._print(f"  ⚠️  ZIP may be password protected - will attempt extraction")
                 
                 # Get file count for progress
-                file_count = len(zip_ref.infolist())
+                file_count = len(infos)
                 if file_count > 100:
-                    print(f"  📊 Extracting {file_count} files...")
+                    self._print_now(f"  📊 Extracting {file_count} files from {archive_path.name}...")
                 
-                zip_ref.extractall(extract_to)
-            return True
+                members = []
+                for info in infos:
+                    target_path = self._member_path(extract_to, info.filename)
+                    if target_path is None:
+                        self._print(f"  ⚠️  Skipping unsafe path: {info.filename}")
+                        continue
+                    if target_path == extract_to:
+                        continue  # Root entry - nothing to create
+                    self._record_top_level(extract_to, target_path, top_level)
+                    members.append((info, target_path))
+                
+                # Create each directory once up front rather than a mkdir per member
+                directories = {target_path if info.is_dir() else target_path.parent
+                               for info, target_path in members}
+                for directory in sorted(directories):
+                    directory.mkdir(parents=True, exist_ok=True)
+                
+                for info, target_path in members:
+                    self._check_cancelled()
+                    if not info.is_dir():
+                        with zip_ref.open(info) as source:
+                            self._write_member(source, target_path)
+            return True, len(members)
+        except ExtractionCancelled:
+            raise
         except zipfile.BadZipFile:
-            print(f"  ❌ ZIP file is corrupted or invalid")
-            return False
+            self._print(f"  ❌ ZIP file is corrupted or invalid")
+            return False, 0
         except PermissionError:
-            print(f"  ❌ Permission denied - check file/folder permissions")
-            return False
+            self._print(f"  ❌ Permission denied - check file/folder permissions")
+            return False, 0
         except OSError as e:
             if "No space left" in str(e):
-                print(f"  ❌ Disk full - not enough space to extract")
+                self._print(f"  ❌ Disk full - not enough space to extract")
             elif "name too long" in str(e).lower():
-                print(f"  ❌ Path too long - try PowerShell version on Windows")
+                self._print(f"  ❌ Path too long - try PowerShell version on Windows")
             else:
-                print(f"  ❌ System error: {e}")
-            return False
+                self._print(f"  ❌ System error: {e}")
+            return False, 0
         except Exception as e:
-            print(f"  ❌ ZIP extraction failed: {e}")
-            return False
+            self._print(f"  ❌ ZIP extraction failed: {e}")
+            return False, 0
     
-    def _extract_rar(self, archive_path, extract_to):
+    def _extract_rar(self, archive_path, extract_to, top_level):
         """Extract RAR files"""
         if not HAS_RAR:
-            print(f"  ⚠️  Skipping RAR: rarfile not installed (pip install rarfile)")
-            return False
+            self._print(f"  ⚠️  Skipping RAR: rarfile not installed (pip install rarfile)")
+            return False, 0
         try:
             with rarfile.RarFile(archive_path, 'r') as rar_ref:
                 # Check if RAR is password protected
                 if rar_ref.needs_password():
-                    print(f"  ⚠️  RAR is password protected - extraction may fail")
+                    self._print(f"  ⚠️  RAR is password protected - extraction may fail")
                 
                 # Get file count for progress
-                try:
-                    file_count = len(rar_ref.infolist())
-                    if file_count > 50:
-                        print(f"  📊 Extracting {file_count} files...")
-                except:
-                    pass  # Some RAR files don't support this
+                names = rar_ref.namelist()
+                if len(names) > 50:
+                    self._print_now(f"  📊 Extracting {len(names)} files from {archive_path.name}...")
+                
+                for name in names:
+                    target_path = self._member_path(extract_to, name)
+                    if target_path is not None and target_path != extract_to:
+                        self._record_top_level(extract_to, target_path, top_level)
                 
                 rar_ref.extractall(extract_to)
-            return True
+            return True, len(names)
         except rarfile.BadRarFile:
-            print(f"  ❌ RAR file is corrupted or invalid")
-            return False
+            self._print(f"  ❌ RAR file is corrupted or invalid")
+            return False, 0
         except rarfile.PasswordRequired:
-            print(f"  ❌ RAR requires password - unsupported")
-            return False
+            self._print(f"  ❌ RAR requires password - unsupported")
+            return False, 0
         except PermissionError:
-            print(f"  ❌ Permission denied - check file/folder permissions")
-            return False
+            self._print(f"  ❌ Permission denied - check file/folder permissions")
+            return False, 0
         except Exception as e:
-            print(f"  ❌ RAR extraction failed: {e}")
-            return False
+            self._print(f"  ❌ RAR extraction failed: {e}")
+            return False, 0
     
-    def _extract_7z(self, archive_path, extract_to):
+    def _extract_7z(self, archive_path, extract_to, top_level):
         """Extract 7Z files"""
         if not HAS_7Z:
-            print(f"  ⚠️  Skipping 7Z: py7zr not installed (pip install py7zr)")
-            return False
+            self._print(f"  ⚠️  Skipping 7Z: py7zr not installed (pip install py7zr)")
+            return False, 0
         try:
+            # Given a path (not a file object), py7zr can decompress folders in parallel
             with py7zr.SevenZipFile(archive_path, 'r') as seven_z_ref:
                 # Check if 7Z is password protected
                 if seven_z_ref.password_protected:
-                    print(f"  ⚠️  7Z is password protected - extraction may fail")
+                    self._print(f"  ⚠️  7Z is password protected - extraction may fail")
                 
                 # Get file count for progress
-                file_count = len(seven_z_ref.files)
-                if file_count > 100:
-                    print(f"  📊 Extracting {file_count} files...")
+                names = seven_z_ref.getnames()
+                if len(names) > 100:
+                    self._print_now(f"  📊 Extracting {len(names)} files from {archive_path.name}...")
+                
+                for name in names:
+                    target_path = self._member_path(extract_to, name)
+                    if target_path is not None and target_path != extract_to:
+                        self._record_top_level(extract_to, target_path, top_level)
                 
                 seven_z_ref.extractall(extract_to)
-            return True
+            return True, len(names)
         except py7zr.Bad7zFile:
-            print(f"  ❌ 7Z file is corrupted or invalid")
-            return False
+            self._print(f"  ❌ 7Z file is corrupted or invalid")
+            return False, 0
         except py7zr.PasswordRequired:
-            print(f"  ❌ 7Z requires password - unsupported")
-            return False
+            self._print(f"  ❌ 7Z requires password - unsupported")
+            return False, 0
         except PermissionError:
-            print(f"  ❌ Permission denied - check file/folder permissions")
-            return False
+            self._print(f"  ❌ Permission denied - check file/folder permissions")
+            return False, 0
         except Exception as e:
-            print(f"  ❌ 7Z extraction failed: {e}")
-            return False
+            self._print(f"  ❌ 7Z extraction failed: {e}")
+            return False, 0
     
-    def _extract_tar(self, archive_path, extract_to):
+    def _extract_tar(self, archive_path, extract_to, top_level):
         """Extract TAR, TAR.GZ, TAR.BZ2, TGZ files"""
         try:
-            with tarfile.open(archive_path, 'r:*') as tar_ref:
-                # Get file count for progress
-                file_count = len(tar_ref.getnames())
-                if file_count > 50:
-                    print(f"  📊 Extracting {file_count} files...")
+            # Stream mode reads members strictly in order (no seeking back through the archive);
+            # tarfile does the buffering in COPY_BUFFER_SIZE reads, so the file itself is unbuffered
+            with self._open_sequential(archive_path, buffering=0) as archive_file, \
+                    tarfile.open(fileobj=archive_file, mode='r|*', bufsize=self.COPY_BUFFER_SIZE) as tar_ref:
+                # Members are counted while extracting - getnames() up front would
+                # read (and for .tar.gz decompress) the whole archive an extra time
+                file_count = 0
+                created_dirs = set()  # Stream mode can't list directories up front, so memoize mkdir
+                directories = []  # Mode and mtime applied after all files, as extractall() does
+                real_root = os.path.realpath(extract_to)
+                links_seen = False  # Once a link exists, later members may resolve through it
+                for member in tar_ref:
+                    self._check_cancelled()
+                    target_path = self._member_path(extract_to, member.name)
+                    if target_path is None:
+                        self._print(f"  ⚠️  Skipping unsafe path: {member.name}")
+                        continue
+                    if target_path == extract_to:
+                        continue  # Root entry - nothing to create
+                    if links_seen and not self._is_inside(target_path, real_root):
+                        self._print(f"  ⚠️  Skipping path through a link outside the folder: {member.name}")
+                        continue
+                    if member.issym() or member.islnk():
+                        # Symlinks resolve from their own folder, hard links from the archive root
+                        link_base = target_path.parent if member.issym() else extract_to
+                        link_target = link_base / member.linkname
+                        if not self._is_inside(link_target, real_root):
+                            self._print(f"  ⚠️  Skipping link pointing outside the folder: {member.name}")
+                            continue
+                        links_seen = True
+                    self._record_top_level(extract_to, target_path, top_level)
+                    file_count += 1
+                    if target_path.parent not in created_dirs:
+                        target_path.parent.mkdir(parents=True, exist_ok=True)
+                        created_dirs.add(target_path.parent)
+                    if member.issym() or member.islnk():
+                        # tarfile's own fallback seeks back to the target member, which a stream can't
+                        self._make_link(member, target_path, link_target)
+                        continue
+                    if member.isdir():
+                        # Default permissions for now - a read-only directory must still take its files
+                        target_path.mkdir(parents=True, exist_ok=True)
+                        created_dirs.add(target_path)
+                        directories.append((member, target_path))
+                        continue
+                    if not member.isreg():
+                        tar_ref.extract(member, extract_to)  # Devices, FIFOs
+                        continue
+                    with tar_ref.extractfile(member) as source:
+                        self._write_member(source, target_path)
+                    tar_ref.chmod(member, str(target_path))
+                    tar_ref.utime(member, str(target_path))
                 
-                tar_ref.extractall(extract_to)
-            return True
+                # Deepest directories first, so a parent's mode can't block its children
+                directories.sort(key=lambda item: item[0].name, reverse=True)
+                for member, target_path in directories:
+                    tar_ref.chmod(member, str(target_path))
+                    tar_ref.utime(member, str(target_path))
+                
+                if file_count > 50:
+                    self._print(f"  📊 Extracted {file_count} files")
+            return True, file_count
+        except ExtractionCancelled:
+            raise
         except tarfile.ReadError:
-            print(f"  ❌ TAR file is corrupted or invalid")
-            return False
+            self._print(f"  ❌ TAR file is corrupted or invalid")
+            return False, 0
         except tarfile.CompressionError:
-            print(f"  ❌ TAR compression error - file may be corrupted")
-            return False
+            self._print(f"  ❌ TAR compression error - file may be corrupted")
+            return False, 0
         except PermissionError:
-            print(f"  ❌ Permission denied - check file/folder permissions")
-            return False
+            self._print(f"  ❌ Permission denied - check file/folder permissions")
+            return False, 0
         except OSError as e:
             if "No space left" in str(e):
-                print(f"  ❌ Disk full - not enough space to extract")
+                self._print(f"  ❌ Disk full - not enough space to extract")
             elif "name too long" in str(e).lower():
-                print(f"  ❌ Path too long - try PowerShell version on Windows")
+                self._print(f"  ❌ Path too long - try PowerShell version on Windows")
             else:
-                print(f"  ❌ System error: {e}")
-            return False
+                self._print(f"  ❌ System error: {e}")
+            return False, 0
         except Exception as e:
-            print(f"  ❌ TAR extraction failed: {e}")
-            return False
+            self._print(f"  ❌ TAR extraction failed: {e}")
+            return False, 0
+    
+    def _extract_compressed(self, archive_path, extract_to, top_level, opener, label):
+        """Decompress a single-file GZ/BZ2 stream into extract_to"""
+        target_path = extract_to / archive_path.stem  # 'dump.sql.gz' -> 'dump.sql'
+        try:
+            with self._open_sequential(archive_path, self.COPY_BUFFER_SIZE) as archive_file, \
+                    opener(archive_file, 'rb') as source:
+                # A tarball named without '.tar' (backup.gz) still has to be unpacked
+                header = source.read(tarfile.BLOCKSIZE)
+                is_tar = self._is_tar_header(header)
+                if not is_tar:
+                    self._record_top_level(extract_to, target_path, top_level)
+                    with open(target_path, 'wb') as target:
+                        target.write(header)
+                        shutil.copyfileobj(source, target, self.COPY_BUFFER_SIZE)
+            if is_tar:
+                return self._extract_tar(archive_path, extract_to, top_level)
+            return True, 1
+        except EOFError:
+            self._print(f"  ❌ {label} file is truncated or corrupted")
+            return False, 0
+        except PermissionError:
+            self._print(f"  ❌ Permission denied - check file/folder permissions")
+            return False, 0
+        except OSError as e:
+            if "No space left" in str(e):
+                self._print(f"  ❌ Disk full - not enough space to extract")
+            elif "name too long" in str(e).lower():
+                self._print(f"  ❌ Path too long - try PowerShell version on Windows")
+            else:
+                # gzip/bz2 report a bad stream as a plain OSError
+                self._print(f"  ❌ {label} file is corrupted or invalid: {e}")
+            return False, 0
+        except Exception as e:
+            self._print(f"  ❌ {label} extraction failed: {e}")
+            return False, 0
+    
+    def _is_tar_header(self, header):
+        """Check whether a decompressed block is a valid TAR header (checksum and all)"""
+        try:
+            tarfile.TarInfo.frombuf(header, tarfile.ENCODING, 'surrogateescape')
+            return True
+        except tarfile.HeaderError:
+            return False  # Too short, empty or bad checksum - not a tarball
+    
+    def _extract_gz(self, archive_path, extract_to, top_level):
+        """Extract single-file GZ files"""
+        return self._extract_compressed(archive_path, extract_to, top_level, gzip.open, 'GZ')
+    
+    def _extract_bz2(self, archive_path, extract_to, top_level):
+        """Extract single-file BZ2 files"""
+        return self._extract_compressed(archive_path, extract_to, top_level, bz2.open, 'BZ2')
     
     def _get_extract_method(self, file_path):
         """Get the appropriate extraction method"""
-        file_path_str = str(file_path).lower()
-        if file_path_str.endswith('.zip'):
+        name = file_path.name.lower()  # Only the filename, not the whole path
+        if name.endswith('.zip'):
             return self._extract_zip
-        elif file_path_str.endswith('.rar'):
+        elif name.endswith('.rar'):
             return self._extract_rar
-        elif file_path_str.endswith('.7z'):
+        elif name.endswith('.7z'):
             return self._extract_7z
-        else:  # TAR, GZ, BZ2, TGZ, TAR.GZ, TAR.BZ2
+        elif name.endswith(('.tar.gz', '.tar.bz2', '.tgz', '.tar')):
             return self._extract_tar
+        elif name.endswith('.gz'):  # Single compressed file - skip tarfile's format probing
+            return self._extract_gz
+        else:  # BZ2
+            return self._extract_bz2
     
     def _get_extraction_path(self, archive_path):
         """Determine where to extract the archive"""
@@ -294,64 +600,117 @@ class SimpleExtractor:
     def _extract_with_cleanup(self, archive_path, extract_to, extract_method):
         """Extract archive with automatic cleanup on failure"""
         created_extraction_dir = False
+        top_level = {}  # Top-level item -> True if this extraction created it
         
         try:
-            # Remember what was there before
-            existing_items = set(extract_to.iterdir()) if extract_to.exists() else set()
-            
             # Create extraction directory if needed
             if not extract_to.exists():
                 extract_to.mkdir(parents=True, exist_ok=True)
                 created_extraction_dir = True
             
             # Attempt extraction
-            success = extract_method(archive_path, extract_to)
+            success, file_count = extract_method(archive_path, extract_to, top_level)
             
             if not success:
                 raise Exception("Extraction method returned False")
             
             # Verify something was actually extracted
-            new_items = set(extract_to.iterdir()) - existing_items
-            if not new_items:
+            if not file_count:
                 raise Exception("No files were extracted")
             
             return True
+        
+        except ExtractionCancelled:
+            # Ctrl-C: roll back quietly - this isn't a failure of the archive
+            try:
+                self._remove_partial(extract_to, created_extraction_dir, top_level)
+            except Exception:
+                pass
+            raise
             
         except Exception as e:
-            print(f"  ❌ Extraction failed: {e}")
-            print(f"  🧹 Cleaning up partial extraction...")
+            self._print(f"  ❌ Extraction failed: {e}")
+            self._print(f"  🧹 Cleaning up partial extraction...")
             
-            # Clean up: remove newly created items
             try:
-                if extract_to.exists():
-                    current_items = set(extract_to.iterdir())
-                    new_items = current_items - existing_items
-                    
-                    for item in new_items:
-                        try:
-                            if item.is_file():
-                                item.unlink()
-                            elif item.is_dir():
-                                shutil.rmtree(item)
-                        except:
-                            pass
-                    
-                    # Remove directory if we created it and it's now empty
-                    if created_extraction_dir:
-                        try:
-                            if not list(extract_to.iterdir()):
-                                extract_to.rmdir()
-                        except:
-                            pass
-                    
-                    self.stats['cleaned_up'] += 1
-                    print(f"  ✓ Cleanup complete")
+                if self._remove_partial(extract_to, created_extraction_dir, top_level):
+                    with self._lock:
+                        self.stats['cleaned_up'] += 1
+                    self._print(f"  ✓ Cleanup complete")
                         
             except Exception as cleanup_error:
-                print(f"  ⚠️  Cleanup warning: {cleanup_error}")
+                self._print(f"  ⚠️  Cleanup warning: {cleanup_error}")
             
             return False
     
+    def _remove_partial(self, extract_to, created_extraction_dir, top_level):
+        """Remove only the items a failed extraction created (False if there was nothing)"""
+        if not extract_to.exists():
+            return False
+        if created_extraction_dir:
+            # Everything inside is ours
+            shutil.rmtree(extract_to, ignore_errors=True)
+        else:
+            for item, is_new in top_level.items():
+                if not is_new:
+                    continue
+                try:
+                    if item.is_dir() and not item.is_symlink():
+                        shutil.rmtree(item)
+                    else:
+                        item.unlink()
+                except:
+                    pass
+        return True
+    
+    def _group_by_output_tree(self, jobs):
+        """Group jobs whose extraction directories overlap, keeping their original order"""
+        roots = set(self._outermost_dirs({extract_to for _, _, extract_to, _ in jobs}))
+        groups = {}
+        for job in jobs:
+            extract_to = job[2]
+            root = next(d for d in (extract_to, *extract_to.parents) if d in roots)
+            groups.setdefault(root, []).append(job)
+        return list(groups.values())
+    
+    def _extract_group(self, group, total, buffered=True):
+        """Extract one group of archives in a worker thread, returning their results"""
+        results = []
+        for idx, archive_path, extract_to, file_size in group:
+            if self._cancelled.is_set():
+                break
+            
+            # Progress indicator - shown as soon as the archive starts
+            self._print_now(f"\n📦 [{idx}/{total}] Extracting: {archive_path.name}\n"
+                            f"   From: {archive_path.parent}\n"
+                            f"   To:   {extract_to}\n"
+                            f"   Size: {self._format_size(file_size)}")
+            
+            # With other workers running, details are collected and printed as one block
+            # when the archive is done; a lone worker prints them as they happen
+            if buffered:
+                self._output.lines = [f"\n📋 [{idx}/{total}] {archive_path.name}:"]
+            
+            # Extract archive with cleanup on failure
+            try:
+                extract_method = self._get_extract_method(archive_path)
+                success = bool(extract_method) and self._extract_with_cleanup(
+                    archive_path, extract_to, extract_method)
+            except ExtractionCancelled:
+                self._output.lines = None  # Drop this archive's details - the run is stopping
+                break
+            except Exception as e:
+                self._print(f"  ❌ Unexpected error: {e}")
+                success = False
+            if success:
+                self._print(f"  ✅ Success")
+            
+            if buffered:
+                self._print_now("\n".join(self._output.lines))
+                self._output.lines = None
+            results.append((archive_path, extract_to, file_size, success))
+        return results
+    
     def _delete_archives(self):
         """Delete all successfully extracted archives at the end"""
         if not self.delete_after or not self.pending_deletions:
@@ -361,18 +720,29 @@ class SimpleExtractor:
         print("   (This happens at the end to prevent data loss if interrupted)")
         print()
         
+        # One unlink per archive - a missing file is simply skipped, no exists() check first
+        deleted = []
+        errors = []
         for archive_path in self.pending_deletions:
             try:
-                if archive_path.exists():
-                    archive_path.unlink()
-                    self.stats['deleted'] += 1
-                    print(f"  ✓ {archive_path.name}")
-            except Exception as e:
-                print(f"  ✗ {archive_path.name}: {e}")
+                os.unlink(archive_path)
+                deleted.append(f"  ✓ {archive_path.name}")
+            except FileNotFoundError:
+                pass  # Already gone
+            except OSError as e:
+                errors.append(f"  ✗ {archive_path.name}: {e}")
+        self.stats['deleted'] += len(deleted)
+        
+        # Print in one write; long runs only get the count
+        if len(deleted) > 50:
+            deleted = [f"  ✓ Deleted {len(deleted)} archives"]
+        lines = deleted + errors
+        if lines:
+            print("\n".join(lines))
     
     def extract_all(self):
         """Recursively extract all archives"""
-        self.start_time = datetime.now()
+        self.start_time = time.perf_counter()  # Monotonic, cheaper than datetime.now()
         
         print("=" * 60)
         print("  📂 Unfolder - Simple Archive Extractor")
@@ -389,15 +759,25 @@ class SimpleExtractor:
             print("  ℹ️  RAR support: Install rarfile for full support")
         print("")
         
+        # Bound once - these run for every archive in every round
+        iter_archives = self._iter_archives
+        file_id = self._file_id
+        get_extraction_path = self._get_extraction_path
+        get_file_size = self._get_file_size
+        processed_files = self.processed_files
+        stats = self.stats
+        
         round_num = 1
+        scan_roots = [self.source_folder]  # Round 1 scans everything
         while True:
-            # Find all archive files
+            # Find all archive files - new ones can only appear where the last round extracted.
+            # Each entry's id is computed once (on Windows that is a stat call) and kept with it.
             all_archives = []
-            for root, dirs, files in os.walk(self.source_folder):
-                for file in files:
-                    file_path = Path(root) / file
-                    if self._is_archive(file_path) and str(file_path) not in self.processed_files:
-                        all_archives.append(file_path)
+            for root in scan_roots:
+                for entry in iter_archives(root):
+                    key = file_id(entry)
+                    if key not in processed_files:
+                        all_archives.append((entry, key))
             
             if not all_archives:
                 print("✅ No more archives found to extract")
@@ -405,34 +785,50 @@ class SimpleExtractor:
             
             print(f"\n--- Round {round_num}: Found {len(all_archives)} new archive(s) ---")
             
-            for idx, archive_path in enumerate(all_archives, 1):
+            jobs = []
+            for idx, (entry, key) in enumerate(all_archives, 1):
                 # Mark as processed immediately to avoid infinite loops
-                self.processed_files.add(str(archive_path))
-                
-                extract_to = self._get_extraction_path(archive_path)
+                processed_files.add(key)
                 
-                # Get file size for statistics
-                file_size = self._get_file_size(archive_path)
+                archive_path = Path(entry.path)
+                extract_to = get_extraction_path(archive_path)
                 
-                # Progress indicator
-                print(f"\n📦 [{idx}/{len(all_archives)}] Extracting: {archive_path.name}")
-                print(f"   From: {archive_path.parent}")
-                print(f"   To:   {extract_to}")
-                print(f"   Size: {self._format_size(file_size)}")
+                # Get file size for statistics (reuses the DirEntry's stat)
+                file_size = get_file_size(entry)
                 
-                # Extract archive with cleanup on failure
-                extract_method = self._get_extract_method(archive_path)
-                if extract_method and self._extract_with_cleanup(archive_path, extract_to, extract_method):
-                    print(f"  ✅ Success")
-                    self.stats['extracted'] += 1
-                    self.stats['total_size'] += file_size
-                    
-                    # Queue for deletion (don't delete yet!)
-                    if self.delete_after:
-                        self.pending_deletions.append(archive_path)
-                else:
-                    self.stats['failed'] += 1
+                jobs.append((idx, archive_path, extract_to, file_size))
             
+            # Archives writing into overlapping trees share a group and run in order;
+            # separate groups extract in parallel (zlib/bz2/lzma release the GIL)
+            groups = self._group_by_output_tree(jobs)
+            extracted_dirs = set()
+            max_workers = min(os.cpu_count() or 1, len(groups))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._extract_group, group, len(all_archives), max_workers > 1)
+                           for group in groups]
+                try:
+                    for future in as_completed(futures):
+                        for archive_path, extract_to, file_size, success in future.result():
+                            if success:
+                                stats['extracted'] += 1
+                                extracted_dirs.add(extract_to)
+                                stats['total_size'] += file_size
+                                
+                                # Queue for deletion (don't delete yet!)
+                                if self.delete_after:
+                                    self.pending_deletions.append(archive_path)
+                            else:
+                                stats['failed'] += 1
+                except KeyboardInterrupt:
+                    # Leaving the with-block waits for the workers, so make them stop first:
+                    # queued groups never start, running ones give up at their next member
+                    print("\n⚠️  Interrupted - stopping extraction...")
+                    self._cancelled.set()
+                    for future in futures:
+                        future.cancel()
+                    raise
+            
+            scan_roots = self._outermost_dirs(extracted_dirs)
             round_num += 1
         
         # NOW delete if requested (after ALL extraction is complete)
@@ -442,8 +838,10 @@ class SimpleExtractor:
     
     def _print_summary(self):
         """Print extraction summary"""
-        elapsed = datetime.now() - self.start_time
-        elapsed_str = str(elapsed).split('.')[0]  # Remove microseconds
+        elapsed = time.perf_counter() - self.start_time  # Seconds
+        minutes, seconds = divmod(int(elapsed), 60)
+        hours, minutes = divmod(minutes, 60)
+        elapsed_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
         
         print("\n" + "=" * 60)
         print("🎉 EXTRACTION COMPLETE!")
@@ -458,8 +856,8 @@ class SimpleExtractor:
         print(f"⏱️  Time elapsed: {elapsed_str}")
         
         # Calculate speed if we processed anything
-        if self.stats['total_size'] > 0 and elapsed.total_seconds() > 0:
-            speed = self.stats['total_size'] / elapsed.total_seconds()
+        if self.stats['total_size'] > 0 and elapsed > 0:
+            speed = self.stats['total_size'] / elapsed
             print(f"🚀 Average speed: {self._format_size(speed)}/s")
         
         print("=" * 60)
@@ -475,12 +873,7 @@ def preview_extraction(source_folder):
     # Create a temporary extractor just to use its helper methods
     temp_extractor = SimpleExtractor(source_folder)
     
-    all_archives = []
-    for root, dirs, files in os.walk(source_folder):
-        for file in files:
-            file_path = Path(root) / file
-            if temp_extractor._is_archive(file_path):
-                all_archives.append(file_path)
+    all_archives = list(temp_extractor._iter_archives(source_folder))
     
     if not all_archives:
         print("❌ No archives found in this folder")
@@ -489,8 +882,9 @@ def preview_extraction(source_folder):
     print(f"📦 Found {len(all_archives)} archive(s):\n")
     
     total_size = 0
-    for i, archive in enumerate(all_archives, 1):
-        size = temp_extractor._get_file_size(archive)
+    for i, entry in enumerate(all_archives, 1):
+        archive = Path(entry.path)
+        size = temp_extractor._get_file_size(entry)
         total_size += size
         extract_to = temp_extractor._get_extraction_path(archive)
         
@@ -543,6 +937,7 @@ def parse_arguments():
     source_folder = None
     dry_run = False
     maintain_hierarchy = True  # Default to nested mode
+    interactive = False
     
     i = 1
     while i < len(sys.argv):
@@ -557,6 +952,8 @@ def parse_arguments():
             maintain_hierarchy = True
         elif arg == '--flat':
             maintain_hierarchy = False
+        elif arg == '--interactive' or arg == '-i':
+            interactive = True
         elif arg == '--help' or arg == '-h':
             print_help()
             sys.exit(0)
@@ -567,7 +964,7 @@ def parse_arguments():
             source_folder = arg
         i += 1
     
-    return source_folder, delete_after, dry_run, maintain_hierarchy
+    return source_folder, delete_after, dry_run, maintain_hierarchy, interactive
 
 
 def print_help():
@@ -588,6 +985,8 @@ Options:
   --nested            Extract nested archives in-place - maintains hierarchy (default)
   --hierarchy         Same as --nested
   --flat              Extract all archives as siblings (alternative mode)
+  --interactive, -i   Ask about deletion and check Windows long path support
+                      (automatic when no folder is given)
   --help, -h          Show this help message
   --version, -v       Show version information
 
@@ -612,10 +1011,14 @@ def main():
     print()
     
     # Parse arguments
-    source_folder, delete_after, dry_run, maintain_hierarchy = parse_arguments()
+    source_folder, delete_after, dry_run, maintain_hierarchy, interactive = parse_arguments()
+    
+    # Someone picking the folder by hand is at the keyboard; scripted runs skip the
+    # registry probe, PowerShell offer and prompts unless --interactive is given
+    interactive = interactive or not source_folder
     
     # Check Windows long path support if on Windows
-    if sys.platform == 'win32':
+    if sys.platform == 'win32' and interactive:
         long_path_status = check_long_path_support_windows()
         print()
         
@@ -649,8 +1052,10 @@ def main():
         preview_extraction(source_folder)
         sys.exit(0)
     
-    # Ask about deletion if not specified via command line
-    if delete_after is None:
+    # Ask about deletion if not specified via command line (keep archives when not interactive)
+    if delete_after is None and not interactive:
+        delete_after = False
+    elif delete_after is None:
         print(f"📁 Source: {source_folder}")
         print()
         while True: